@@ -1,11 +1,12 @@
-import pandas as pd
+import polars as pl
 import datetime as dt
-import re
 import pathlib
 import argparse
 
 start_date = dt.date(2025, 4, 8)
 
+DAY_RE = r"(?i)Day\s+(\d+)"
+
 header_to_field = {
     "Weight":              "weight_kg_txt",
     "Budgeted kcal":       "kcal_budgeted_txt",
@@ -35,50 +36,53 @@ def main():
     print(f"🔄 Processing {input_path}...")
 
     try:
-        df = pd.read_csv(input_path)
+        # Scan lazily with every column as a string; only Day and the mapped
+        # columns selected below are actually parsed
+        lf = pl.scan_csv(input_path, infer_schema_length=0)
+        columns = lf.collect_schema().names()
     except Exception as e:
         print(f"❌ Error reading CSV file: {e}")
         return
 
-    # Corrected regex: use \s+ for whitespace and \d+ for digits
-    day_re = re.compile(r"Day\s+(\d+)", re.I)
-
-    if "Day" not in df.columns:
+    if "Day" not in columns:
         print("❌ Error: 'Day' column not found in the input CSV.")
         # Optionally, create an empty output file or exit
         # For now, let's create an empty dataframe to signify no processable data
-        out_df = pd.DataFrame()
+        out_df = pl.DataFrame()
     else:
-        df_filtered = df[df["Day"].astype(str).str.contains(day_re, na=False)].copy() # Use contains and na=False
+        present = []
+        for old_col, new_col_name in header_to_field.items():
+            if old_col in columns:
+                present.append(old_col)
+            else:
+                print(f"🔍 Note: Column '{old_col}' (for '{new_col_name}') not found. It will be skipped.")
 
-        if df_filtered.empty:
-            print("⚠️ Warning: No rows matched the 'Day N' format (e.g., 'Day 123'). Output might be empty or only headers.")
-            out_df = pd.DataFrame() # Prepare an empty DataFrame
-        else:
-            # Extract N and compute log_date vector-wise
-            df_filtered.loc[:, "day_num"] = df_filtered["Day"].str.extract(day_re, expand=False).astype(int)
-            df_filtered.loc[:, "log_date"] = pd.to_datetime(start_date) + pd.to_timedelta(df_filtered["day_num"] - 1, unit="d")
+        # Extract N from "Day N", drop non-matching rows and compute log_date.
+        # The file is only parsed at collect(), so read errors surface here.
+        try:
+            out_df = (
+                lf
+                .with_columns(pl.col("Day").str.extract(DAY_RE, 1).cast(pl.Int32).alias("day_num"))
+                .drop_nulls("day_num")
+                .with_columns(
+                    (pl.lit(start_date) + pl.duration(days=pl.col("day_num") - 1)).cast(pl.Date).alias("log_date")
+                )
+                .select(["log_date", *[pl.col(c).alias(header_to_field[c]) for c in present]])
+                .collect()
+            )
+        except Exception as e:
+            print(f"❌ Error reading CSV file: {e}")
+            return
 
-            out_data = {}
-            out_data["log_date"] = df_filtered["log_date"]
-
-            for old_col, new_col_name in header_to_field.items():
-                if old_col in df_filtered.columns:
-                    out_data[new_col_name] = df_filtered[old_col]
-                else:
-                    print(f"🔍 Note: Column '{old_col}' (for '{new_col_name}') not found. It will be skipped.")
-
-            out_df = pd.DataFrame(out_data)
-            # Reorder columns
-            cols = ["log_date"] + [col for col in out_df.columns if col != "log_date"]
-            out_df = out_df[cols]
+        if out_df.is_empty():
+            print("⚠️ Warning: No rows matched the 'Day N' format (e.g., 'Day 123'). Output might be empty or only headers.")
 
     try:
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        out_df.to_csv(output_path, index=False)
-        if out_df.empty and "Day" not in df.columns:
+        out_df.write_csv(output_path)
+        if out_df.is_empty() and "Day" not in columns:
              print(f"⚠️  Wrote {output_path}, but it's empty as 'Day' column was missing or no data matched.")
-        elif out_df.empty:
+        elif out_df.is_empty():
             print(f"⚠️  Wrote {output_path}, but it's empty as no rows matched the 'Day N' format.")
         else:
             print(f"✅ Wrote {output_path} with {len(out_df)} rows")
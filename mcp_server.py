@@ -1,24 +1,48 @@
 from __future__ import annotations
 
 import os
-import json
+import datetime as dt
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Annotated
 import asyncpg
+import msgspec
+import orjson
 from dotenv import load_dotenv
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import Response
 from mcp.server.fastmcp import FastMCP
 import contextlib
 
+load_dotenv()
+DATABASE_URL = os.environ.get("DATABASE_URL")
+if not DATABASE_URL:
+    raise RuntimeError("DATABASE_URL environment variable is required")
+
 pool: asyncpg.pool.Pool | None = None
 
+# JSON response rendered with orjson; dates/datetimes are encoded natively
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
 @contextlib.asynccontextmanager
 async def lifespan(server: FastMCP):
     global pool
-    load_dotenv()
-    database_url = os.environ.get("DATABASE_URL")
-    if not database_url:
-        raise RuntimeError("DATABASE_URL environment variable is required")
-    pool = await asyncpg.create_pool(database_url)
+    pool = await asyncpg.create_pool(
+        DATABASE_URL,
+        min_size=int(os.getenv("DB_POOL_MIN", "5")),
+        max_size=int(os.getenv("DB_POOL_MAX", "50")),
+        max_inactive_connection_lifetime=300,
+        command_timeout=30,
+        # The statement set is small and fixed (see SQL below); keep every
+        # statement prepared on each connection for the pool's lifetime.
+        statement_cache_size=len(SQL) + _STMT_CACHE_HEADROOM,
+        max_cached_statement_lifetime=0,
+    )
     try:
         yield
     finally:
@@ -32,189 +56,327 @@ async def get_conn():
         raise RuntimeError("Database pool not initialized")
     return pool.acquire()
 
+# Request payloads, mirroring the *LogRequest structs in models.go. msgspec
+# decodes and validates these in a single pass; ValueErrors raised in
+# __post_init__ surface as msgspec.ValidationError (400).
+NonNegInt = Annotated[int, msgspec.Meta(ge=0)]
+
+# The payloads' "date" arrives as a YYYY-MM-DD string and is replaced by the
+# parsed dt.date in __post_init__; "" means today, like omitempty in the Go handlers
+def _parse_log_date(value: str | None) -> dt.date | None:
+    if not value:
+        return None
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.") from None
+
+class WeightLogRequest(msgspec.Struct):
+    weight_kg: Annotated[float, msgspec.Meta(gt=0)]
+    date: str | None = None
+
+    def __post_init__(self):
+        self.date = _parse_log_date(self.date)
+
+class CalorieEntry(msgspec.Struct):
+    calories: NonNegInt
+    note: str | None = None
+
+class CalorieLogRequest(msgspec.Struct):
+    calories: NonNegInt | None = None
+    note: str | None = None
+    date: str | None = None
+    entries: list[CalorieEntry] | None = None
+
+    # Either a single top-level entry or a batch under "entries", not both
+    def __post_init__(self):
+        self.date = _parse_log_date(self.date)
+        if self.entries is not None:
+            if self.calories is not None:
+                raise ValueError("send either calories or entries, not both")
+            if not self.entries:
+                raise ValueError("entries must contain at least one entry")
+        elif self.calories is None:
+            raise ValueError("calories is required")
+
+class CardioLogRequest(msgspec.Struct):
+    duration_min: NonNegInt
+    date: str | None = None
+
+    def __post_init__(self):
+        self.date = _parse_log_date(self.date)
+
+class MoodLogRequest(msgspec.Struct):
+    mood: int
+    date: str | None = None
+
+    def __post_init__(self):
+        self.date = _parse_log_date(self.date)
+
+# Parse an optional YYYY-MM-DD query parameter; raises ValueError if malformed
+def _query_date(request: Request, name: str) -> dt.date | None:
+    value = request.query_params.get(name)
+    return dt.date.fromisoformat(value) if value else None
+
 USER_ID = 1  # single-user assumption as in Go code
 
+# Route decorator: decode and validate the JSON body into payload_type and
+# expose it as request.state.payload. Stacked above with_conn so invalid
+# bodies get their 400 before a pooled connection is taken.
+def with_payload(payload_type):
+    def decorate(handler):
+        @wraps(handler)
+        async def wrapper(request: Request) -> Response:
+            try:
+                request.state.payload = msgspec.json.decode(await request.body(), type=payload_type)
+            except msgspec.DecodeError as e:
+                return ORJSONResponse({"success": False, "message": str(e)}, status_code=400)
+            return await handler(request)
+        return wrapper
+    return decorate
+
+# Route decorator: acquire one pooled connection for the whole request and
+# expose it to the handler as request.state.conn
+def with_conn(handler):
+    @wraps(handler)
+    async def wrapper(request: Request) -> Response:
+        async with pool.acquire() as conn:
+            request.state.conn = conn
+            return await handler(request)
+    return wrapper
+
+# Get-or-create today's (or the given date's) daily_logs row for the user
+_ENSURE_LOG_SQL = (
+    "INSERT INTO daily_logs (user_id, log_date) VALUES ($1, COALESCE($2::date, CURRENT_DATE)) "
+    "ON CONFLICT (user_id, log_date) DO UPDATE SET log_date=EXCLUDED.log_date RETURNING log_id"
+)
+
+# Extra statement-cache slots for statements asyncpg prepares itself: type
+# introspection and the column lookup behind copy_records_to_table.
+_STMT_CACHE_HEADROOM = 16
+
+# Named SQL used by the handlers. asyncpg prepares each statement once per
+# connection and reuses it from its statement cache on later calls.
+SQL: dict[str, str] = {
+    # 30-day BMI series as response JSON; days without a reading get a null bmi
+    "bmi_30d": """
+        SELECT COALESCE(
+            json_agg(json_build_object('date', to_char(d.dt, 'YYYY-MM-DD'), 'bmi', b.bmi) ORDER BY d.dt),
+            '[]'::json
+        )
+        FROM generate_series(CURRENT_DATE - INTERVAL '29 days', CURRENT_DATE, '1 day') AS d(dt)
+        LEFT JOIN (
+            SELECT log_date, bmi
+            FROM v_bmi
+            WHERE user_id=$1 AND log_date BETWEEN CURRENT_DATE - INTERVAL '29 days' AND CURRENT_DATE
+        ) AS b ON b.log_date = d.dt
+    """,
+    "log_weight": (
+        "INSERT INTO daily_logs (user_id, log_date, weight_kg) VALUES ($1, COALESCE($2::date, CURRENT_DATE), $3) "
+        "ON CONFLICT (user_id, log_date) DO UPDATE SET weight_kg=EXCLUDED.weight_kg"
+    ),
+    "ensure_log": _ENSURE_LOG_SQL,
+    "log_calorie": f"""
+        WITH u AS ({_ENSURE_LOG_SQL})
+        INSERT INTO daily_calorie_entries (log_id, calories, note)
+        SELECT log_id, $3, NULLIF($4,'') FROM u
+    """,
+    "log_cardio": (
+        "INSERT INTO daily_logs (user_id, log_date, total_activity_min) VALUES ($1, COALESCE($2::date, CURRENT_DATE), $3) "
+        "ON CONFLICT (user_id, log_date) DO UPDATE "
+        "SET total_activity_min = COALESCE(daily_logs.total_activity_min, 0) + EXCLUDED.total_activity_min"
+    ),
+    "log_mood": (
+        "INSERT INTO daily_logs (user_id, log_date, mood) VALUES ($1, COALESCE($2::date, CURRENT_DATE), $3) "
+        "ON CONFLICT (user_id, log_date) DO UPDATE SET mood=EXCLUDED.mood"
+    ),
+    "summary_daily_on": """
+        SELECT weight_kg, kcal_estimated, kcal_budgeted, mood, motivation, total_activity_min, sleep_duration
+        FROM v_daily_summary
+        WHERE user_id=$1 AND log_date=$2
+    """,
+    "summary_daily_today": """
+        SELECT weight_kg, kcal_estimated, kcal_budgeted, mood, motivation, total_activity_min, sleep_duration, CURRENT_DATE as log_date
+        FROM v_daily_summary
+        WHERE user_id=$1 AND log_date=CURRENT_DATE
+    """,
+    "calories_today": """
+        SELECT COALESCE(SUM(e.calories),0) as total
+        FROM daily_calorie_entries e
+        JOIN daily_logs dl ON e.log_id=dl.log_id
+        WHERE dl.user_id=$1 AND dl.log_date=CURRENT_DATE
+    """,
+    # Shaped into the response JSON server-side; null notes are omitted and
+    # created_at is rendered in UTC like datetime.isoformat() on asyncpg's value.
+    # Assumes created_at is timestamptz: AT TIME ZONE 'UTC' then yields the UTC
+    # wall time, which makes the literal "+00:00" suffix correct. A plain
+    # timestamp column would be shifted into the session time zone instead.
+    "food_today": """
+        SELECT COALESCE(
+            json_agg(
+                json_strip_nulls(json_build_object(
+                    'id', e.entry_id,
+                    'created_at', to_char(e.created_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"'),
+                    'calories', e.calories,
+                    'note', e.note
+                ))
+                ORDER BY e.created_at
+            ),
+            '[]'::json
+        )
+        FROM daily_calorie_entries e
+        JOIN daily_logs l ON l.log_id=e.log_id
+        WHERE l.user_id=$1 AND l.log_date=CURRENT_DATE
+    """,
+    "week_start_of": "SELECT date_trunc('week', $1::date)",
+    "week_start_current": "SELECT date_trunc('week', CURRENT_DATE)",
+    "weekly_stats": """
+        SELECT avg_weight, total_budgeted, total_estimated, total_deficit
+        FROM v_weekly_stats
+        WHERE user_id=$1 AND week_start=$2
+    """,
+}
+
+async def _ensure_log(conn, log_date: dt.date | None) -> int:
+    return await conn.fetchval(SQL["ensure_log"], USER_ID, log_date)
+
+# In-process cache of rendered GET responses. Keys include _version, which
+# every POST handler bumps after a successful write. The TTL bounds staleness
+# from writes made outside this process (e.g. the Go app on the same database).
+_CACHE_MAX = 256
+_CACHE_TTL = 60.0
+_cache: OrderedDict[tuple, tuple[float, bytes]] = OrderedDict()
+_version = 0
+
+def _cache_get(key: tuple) -> bytes | None:
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    stored_at, body = entry
+    if time.monotonic() - stored_at > _CACHE_TTL:
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return body
+
+def _cache_put(key: tuple, body: bytes) -> None:
+    _cache[key] = (time.monotonic(), body)
+    _cache.move_to_end(key)
+    if len(_cache) > _CACHE_MAX:
+        _cache.popitem(last=False)
+
+def _invalidate_cache() -> None:
+    global _version
+    _version += 1
+
 @server.custom_route("/api/bmi", methods=["GET"])
 async def api_bmi(request: Request) -> Response:
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT d.dt AS log_date, b.bmi AS value
-            FROM generate_series(CURRENT_DATE - INTERVAL '29 days', CURRENT_DATE, '1 day') AS d(dt)
-            LEFT JOIN v_bmi AS b ON b.log_date = d.dt AND b.user_id = $1
-            ORDER BY d.dt
-            """,
-            USER_ID,
-        )
-    result = [
-        {"date": row["log_date"].isoformat(), "bmi": row["value"]}
-        for row in rows
-    ]
-    return JSONResponse(result)
+    key = ("bmi", _version, dt.date.today())
+    body = _cache_get(key)
+    if body is None:
+        async with pool.acquire() as conn:
+            payload = await conn.fetchval(SQL["bmi_30d"], USER_ID)
+        body = payload.encode()
+        _cache_put(key, body)
+    return Response(body, media_type="application/json")
 
 @server.custom_route("/api/log/weight", methods=["POST"])
+@with_payload(WeightLogRequest)
+@with_conn
 async def api_log_weight(request: Request) -> Response:
-    data = await request.json()
-    weight = data.get("weight_kg")
-    if weight is None or weight <= 0:
-        return JSONResponse({"success": False, "message": "weight_kg must be positive"}, status_code=400)
-    date_str = data.get("date")
-    if date_str:
-        try:
-            log_date = date_str
-            # asyncpg can parse string to date directly
-        except Exception:
-            return JSONResponse({"success": False, "message": "Invalid date format. Use YYYY-MM-DD."}, status_code=400)
-    else:
-        log_date = None
-
-    async with pool.acquire() as conn:
-        if log_date:
-            row = await conn.fetchrow(
-                "INSERT INTO daily_logs (user_id, log_date) VALUES ($1, $2) "
-                "ON CONFLICT (user_id, log_date) DO UPDATE SET log_date=EXCLUDED.log_date RETURNING log_id",
-                USER_ID,
-                log_date,
-            )
-        else:
-            row = await conn.fetchrow(
-                "INSERT INTO daily_logs (user_id, log_date) VALUES ($1, CURRENT_DATE) "
-                "ON CONFLICT (user_id, log_date) DO UPDATE SET log_date=EXCLUDED.log_date RETURNING log_id",
-                USER_ID,
-            )
-        log_id = row["log_id"]
-        await conn.execute(
-            "UPDATE daily_logs SET weight_kg=$1 WHERE log_id=$2 AND user_id=$3",
-            weight,
-            log_id,
-            USER_ID,
-        )
-    return JSONResponse({"success": True, "message": "Weight logged successfully"})
+    payload = request.state.payload
+    conn = request.state.conn
+    await conn.execute(
+        SQL["log_weight"],
+        USER_ID,
+        payload.date,
+        payload.weight_kg,
+    )
+    _invalidate_cache()
+    return ORJSONResponse({"success": True, "message": "Weight logged successfully"})
 
 @server.custom_route("/api/log/calorie", methods=["POST"])
+@with_payload(CalorieLogRequest)
+@with_conn
 async def api_log_calorie(request: Request) -> Response:
-    data = await request.json()
-    calories = data.get("calories")
-    if calories is None or calories < 0:
-        return JSONResponse({"success": False, "message": "calories must be non-negative"}, status_code=400)
-    note = data.get("note")
-    date_str = data.get("date")
-    async with pool.acquire() as conn:
-        if date_str:
-            row = await conn.fetchrow(
-                "INSERT INTO daily_logs (user_id, log_date) VALUES ($1, $2) "
-                "ON CONFLICT (user_id, log_date) DO UPDATE SET log_date=EXCLUDED.log_date RETURNING log_id",
-                USER_ID,
-                date_str,
-            )
-        else:
-            row = await conn.fetchrow(
-                "INSERT INTO daily_logs (user_id, log_date) VALUES ($1, CURRENT_DATE) "
-                "ON CONFLICT (user_id, log_date) DO UPDATE SET log_date=EXCLUDED.log_date RETURNING log_id",
-                USER_ID,
-            )
-        log_id = row["log_id"]
+    payload = request.state.payload
+    entries = payload.entries or [CalorieEntry(payload.calories, payload.note)]
+    log_date = payload.date
+    conn = request.state.conn
+    if len(entries) == 1:
         await conn.execute(
-            "INSERT INTO daily_calorie_entries (log_id, calories, note) VALUES ($1, $2, NULLIF($3,''))",
-            log_id,
-            calories,
-            note or "",
+            SQL["log_calorie"],
+            USER_ID,
+            log_date,
+            entries[0].calories,
+            entries[0].note or "",
         )
-    return JSONResponse({"success": True, "message": "Calorie entry logged successfully"})
+    else:
+        async with conn.transaction():
+            log_id = await _ensure_log(conn, log_date)
+            await conn.copy_records_to_table(
+                "daily_calorie_entries",
+                records=[(log_id, e.calories, e.note or None) for e in entries],
+                columns=["log_id", "calories", "note"],
+            )
+    _invalidate_cache()
+    if len(entries) == 1:
+        return ORJSONResponse({"success": True, "message": "Calorie entry logged successfully"})
+    return ORJSONResponse({"success": True, "message": f"{len(entries)} calorie entries logged successfully"})
 
 @server.custom_route("/api/log/cardio", methods=["POST"])
+@with_payload(CardioLogRequest)
+@with_conn
 async def api_log_cardio(request: Request) -> Response:
-    data = await request.json()
-    duration = data.get("duration_min")
-    if duration is None or duration < 0:
-        return JSONResponse({"success": False, "message": "duration_min must be non-negative"}, status_code=400)
-    date_str = data.get("date")
-    async with pool.acquire() as conn:
-        if date_str:
-            row = await conn.fetchrow(
-                "INSERT INTO daily_logs (user_id, log_date) VALUES ($1, $2) "
-                "ON CONFLICT (user_id, log_date) DO UPDATE SET log_date=EXCLUDED.log_date RETURNING log_id",
-                USER_ID,
-                date_str,
-            )
-        else:
-            row = await conn.fetchrow(
-                "INSERT INTO daily_logs (user_id, log_date) VALUES ($1, CURRENT_DATE) "
-                "ON CONFLICT (user_id, log_date) DO UPDATE SET log_date=EXCLUDED.log_date RETURNING log_id",
-                USER_ID,
-            )
-        log_id = row["log_id"]
-        await conn.execute(
-            "UPDATE daily_logs SET total_activity_min = COALESCE(total_activity_min, 0) + $1 "
-            "WHERE log_id=$2 AND user_id=$3",
-            duration,
-            log_id,
-            USER_ID,
-        )
-    return JSONResponse({"success": True, "message": "Cardio activity logged successfully"})
+    payload = request.state.payload
+    conn = request.state.conn
+    await conn.execute(
+        SQL["log_cardio"],
+        USER_ID,
+        payload.date,
+        payload.duration_min,
+    )
+    _invalidate_cache()
+    return ORJSONResponse({"success": True, "message": "Cardio activity logged successfully"})
 
 @server.custom_route("/api/log/mood", methods=["POST"])
+@with_payload(MoodLogRequest)
+@with_conn
 async def api_log_mood(request: Request) -> Response:
-    data = await request.json()
-    mood = data.get("mood")
-    if mood is None:
-        return JSONResponse({"success": False, "message": "mood is required"}, status_code=400)
-    date_str = data.get("date")
-    async with pool.acquire() as conn:
-        if date_str:
-            row = await conn.fetchrow(
-                "INSERT INTO daily_logs (user_id, log_date) VALUES ($1, $2) "
-                "ON CONFLICT (user_id, log_date) DO UPDATE SET log_date=EXCLUDED.log_date RETURNING log_id",
-                USER_ID,
-                date_str,
-            )
-        else:
-            row = await conn.fetchrow(
-                "INSERT INTO daily_logs (user_id, log_date) VALUES ($1, CURRENT_DATE) "
-                "ON CONFLICT (user_id, log_date) DO UPDATE SET log_date=EXCLUDED.log_date RETURNING log_id",
-                USER_ID,
-            )
-        log_id = row["log_id"]
-        await conn.execute(
-            "UPDATE daily_logs SET mood=$1 WHERE log_id=$2 AND user_id=$3",
-            mood,
-            log_id,
-            USER_ID,
-        )
-    return JSONResponse({"success": True, "message": "Mood logged successfully"})
+    payload = request.state.payload
+    conn = request.state.conn
+    await conn.execute(
+        SQL["log_mood"],
+        USER_ID,
+        payload.date,
+        payload.mood,
+    )
+    _invalidate_cache()
+    return ORJSONResponse({"success": True, "message": "Mood logged successfully"})
 
 @server.custom_route("/api/summary/daily", methods=["GET"])
 async def api_summary_daily(request: Request) -> Response:
-    date_str = request.query_params.get("date")
-    if date_str:
-        query_date = date_str
-    else:
-        query_date = None
+    try:
+        query_date = _query_date(request, "date")
+    except ValueError:
+        return ORJSONResponse({"success": False, "message": "Invalid date format. Use YYYY-MM-DD."}, status_code=400)
     async with pool.acquire() as conn:
         if query_date:
             row = await conn.fetchrow(
-                """
-                SELECT weight_kg, kcal_estimated, kcal_budgeted, mood, motivation, total_activity_min, sleep_duration
-                FROM v_daily_summary
-                WHERE user_id=$1 AND log_date=$2
-                """,
+                SQL["summary_daily_on"],
                 USER_ID,
                 query_date,
             )
             log_date = query_date
         else:
             row = await conn.fetchrow(
-                """
-                SELECT weight_kg, kcal_estimated, kcal_budgeted, mood, motivation, total_activity_min, sleep_duration, CURRENT_DATE as log_date
-                FROM v_daily_summary
-                WHERE user_id=$1 AND log_date=CURRENT_DATE
-                """,
+                SQL["summary_daily_today"],
                 USER_ID,
             )
             log_date = None
     if row:
         result = {
-            "log_date": (log_date or row.get("log_date")).isoformat() if isinstance(row.get("log_date"), (str, bytes)) else str(row.get("log_date")),
+            "log_date": log_date or row.get("log_date"),
             "weight_kg": row.get("weight_kg"),
             "kcal_estimated": row.get("kcal_estimated"),
             "kcal_budgeted": row.get("kcal_budgeted"),
@@ -224,76 +386,59 @@ async def api_summary_daily(request: Request) -> Response:
             "sleep_duration": row.get("sleep_duration"),
         }
     else:
-        result = {"log_date": date_str or None}
-    return JSONResponse(result)
+        result = {"log_date": query_date}
+    return ORJSONResponse(result)
 
 @server.custom_route("/api/calories/today", methods=["GET"])
+@with_conn
 async def api_calories_today(request: Request) -> Response:
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT COALESCE(SUM(e.calories),0) as total
-            FROM daily_calorie_entries e
-            JOIN daily_logs dl ON e.log_id=dl.log_id
-            WHERE dl.user_id=$1 AND dl.log_date=CURRENT_DATE
-            """,
-            USER_ID,
-        )
+    conn = request.state.conn
+    row = await conn.fetchrow(
+        SQL["calories_today"],
+        USER_ID,
+    )
     total = row["total"] if row else 0
-    result = {"date": str(await conn.fetchval("SELECT CURRENT_DATE")), "total_calories": total}
-    return JSONResponse(result)
+    result = {"date": dt.date.today(), "total_calories": total}
+    return ORJSONResponse(result)
 
 @server.custom_route("/api/food", methods=["GET"])
+@with_conn
 async def api_food(request: Request) -> Response:
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT e.entry_id, e.created_at, e.calories, e.note
-            FROM daily_calorie_entries e
-            JOIN daily_logs l ON l.log_id=e.log_id
-            WHERE l.user_id=$1 AND l.log_date=CURRENT_DATE
-            ORDER BY e.created_at
-            """,
-            USER_ID,
-        )
-    out = []
-    for row in rows:
-        note = row["note"]
-        out.append(
-            {
-                "id": row["entry_id"],
-                "created_at": row["created_at"].isoformat(),
-                "calories": row["calories"],
-                **({"note": note} if note is not None else {}),
-            }
-        )
-    return JSONResponse(out)
+    conn = request.state.conn
+    payload = await conn.fetchval(SQL["food_today"], USER_ID)
+    return Response(payload, media_type="application/json")
 
 @server.custom_route("/api/summary/weekly", methods=["GET"])
 async def api_summary_weekly(request: Request) -> Response:
-    date_str = request.query_params.get("start_date")
+    try:
+        start_date = _query_date(request, "start_date")
+    except ValueError:
+        return ORJSONResponse({"success": False, "message": "Invalid date format. Use YYYY-MM-DD."}, status_code=400)
+    key = ("summary_weekly", _version, start_date or dt.date.today())
+    body = _cache_get(key)
+    if body is not None:
+        return Response(body, media_type="application/json")
     async with pool.acquire() as conn:
-        if date_str:
-            week_start = await conn.fetchval("SELECT date_trunc('week', $1::date)", date_str)
+        if start_date:
+            week_start = await conn.fetchval(SQL["week_start_of"], start_date)
         else:
-            week_start = await conn.fetchval("SELECT date_trunc('week', CURRENT_DATE)")
+            week_start = await conn.fetchval(SQL["week_start_current"])
         row = await conn.fetchrow(
-            """
-            SELECT avg_weight, total_budgeted, total_estimated, total_deficit
-            FROM v_weekly_stats
-            WHERE user_id=$1 AND week_start=$2
-            """,
+            SQL["weekly_stats"],
             USER_ID,
             week_start,
         )
     result = {
-        "week_start": week_start.isoformat() if week_start else None,
+        "week_start": week_start,
         "avg_weight": row.get("avg_weight") if row else None,
         "total_budgeted": row.get("total_budgeted") if row else None,
         "total_estimated": row.get("total_estimated") if row else None,
         "total_deficit": row.get("total_deficit") if row else None,
     }
-    return JSONResponse(result)
+    response = ORJSONResponse(result)
+    _cache_put(key, response.body)
+    return response
 
 if __name__ == "__main__":
-    server.run("streamable-http")
+    import uvloop
+    uvloop.run(server.run_streamable_http_async())